@@ -1,12 +1,64 @@
+import io
 import os
+import shutil
 import tempfile
 import zipfile
 from flask import Flask, render_template, request
-from eval import evaluate_project
+from eval import evaluate_sources, read_sources, warm_up
 
 app = Flask(__name__)
 app.secret_key = "secret123"     # needed for flash messages
 
+# Uploads up to this size are unzipped straight from memory
+IN_MEMORY_ZIP_LIMIT = 8 * 1024 * 1024
+
+# Largest uncompressed project file read out of an upload
+MAX_MEMBER_SIZE = 1024 * 1024
+
+# Once per worker process, so the first request does not pay for it
+warm_up()
+
+
+# -----------------------------
+# Utility: Upload -> ZIP source
+# -----------------------------
+def zip_source(uploaded, content_length):
+    """Return a readable file object: in memory for small uploads, else a
+    1 MiB-buffered anonymous temp file (removed on close, so nothing is
+    left behind if evaluation fails)."""
+    if content_length and content_length <= IN_MEMORY_ZIP_LIMIT:
+        return io.BytesIO(uploaded.read())
+
+    f = tempfile.TemporaryFile(buffering=1 << 20)
+    shutil.copyfileobj(uploaded.stream, f, 1 << 20)
+    f.seek(0)
+    return f
+
+
+# -----------------------------
+# Utility: Read project from ZIP
+# -----------------------------
+def read_zip_sources(z):
+    """Read README.json and the files it names straight out of the archive."""
+    members = {
+        os.path.normpath(zi.filename): zi
+        for zi in z.infolist()
+        if not zi.is_dir()
+    }
+
+    def read(name):
+        zi = members.get(name)
+        if zi is None:
+            return None  # evaluator reports the missing file
+        # Checked before decompressing, so a zip bomb is never inflated
+        if zi.file_size > MAX_MEMBER_SIZE:
+            raise Exception(
+                f"{name} is larger than {MAX_MEMBER_SIZE >> 20} MiB."
+            )
+        return z.read(zi)
+
+    return read_sources(read)
+
 
 @app.route("/")
 def index():
@@ -20,24 +72,18 @@ def evaluate():
     if not uploaded:
         return render_template("upload.html", error="Please upload a zip file.")
 
-    # Create temporary directory
-    temp_dir = tempfile.mkdtemp(prefix="student_")
-    zip_path = os.path.join(temp_dir, "project.zip")
-    uploaded.save(zip_path)
-
-    # Extract ZIP
-    extract_path = os.path.join(temp_dir, "project")
-    os.makedirs(extract_path, exist_ok=True)
+    # Read ZIP (no extraction to disk)
+    source = zip_source(uploaded, request.content_length)
 
     try:
-        with zipfile.ZipFile(zip_path) as z:
-            z.extractall(extract_path)
+        with source, zipfile.ZipFile(source) as z:
+            sources = read_zip_sources(z)
     except Exception as e:
         return render_template("upload.html", error=f"Error extracting ZIP: {e}")
 
     # Run evaluator
     try:
-        result = evaluate_project(extract_path)
+        result = evaluate_sources(sources)
     except Exception as e:
         return render_template("result.html", error=f"Evaluator crashed: {e}")
 
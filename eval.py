@@ -1,31 +1,425 @@
 import os
 import json
-import importlib.util
+import types
+import functools
 import sqlite3
 import traceback
 import ast
-import subprocess
+import signal
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None  # not available on Windows
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads  # also accepts bytes
+
+try:
+    import pycodestyle
+    _style = pycodestyle.StyleGuide(quiet=True)
+except ImportError:
+    _style = None  # style check is skipped if pycodestyle is not installed
 
 # -----------------------------
 # Utility: Dynamic module import
 # -----------------------------
-def dynamic_import(path, module_name="candidate_module"):
-    spec = importlib.util.spec_from_file_location(module_name, path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+@functools.lru_cache(maxsize=256)
+def _compile_source(src, filename):
+    return compile(src, filename, "exec")
+
+
+class _SourceLoader:
+    # Lets traceback/linecache fetch lines of a module that has no file
+    def __init__(self, src):
+        self.src = src
+
+    def get_source(self, name):
+        return self.src.decode("utf-8", "replace")
+
+
+def dynamic_import_from_bytes(src, module_name="candidate_module",
+                              filename=None):
+    # Only the compiled code is cached (keyed on the source): every call
+    # gets its own module object, so per-evaluation patches never leak
+    filename = filename or f"{module_name}.py"
+    module = types.ModuleType(module_name)
+    module.__file__ = filename
+    module.__loader__ = _SourceLoader(src)
+    exec(_compile_source(src, filename), module.__dict__)
     return module
 
 
+# -----------------------------
+# Utility: Read project from disk
+# -----------------------------
+def read_project_file(project_dir, name):
+    # Missing files are reported by the evaluator, not raised here
+    try:
+        with open(os.path.join(project_dir, name), "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def read_sources(read):
+    """Read README.json and the files it names into a {name: bytes} map.
+    read(name) returns the file's bytes, or None if it is missing."""
+    readme = read("README.json")
+    if readme is None:
+        return {}  # evaluate_sources() reports the missing README.json
+
+    sources = {"README.json": readme}
+    try:
+        names = project_files(load_metadata(sources))
+    except Exception:
+        return sources  # evaluate_sources() reports the bad README.json
+
+    for name in names:
+        data = read(name)
+        if data is not None:
+            sources[name] = data
+    return sources
+
+
+def read_project(project_dir):
+    return read_sources(lambda name: read_project_file(project_dir, name))
+
+
 # -----------------------------
 # Utility: Load README.json
 # -----------------------------
-def load_metadata(project_dir):
-    readme_path = os.path.join(project_dir, "README.json")
-    if not os.path.exists(readme_path):
+def load_metadata(sources):
+    readme = sources.get("README.json")
+    if readme is None:
         raise Exception("❌ Missing README.json – naming conventions unknown.")
 
-    with open(readme_path, "r") as f:
-        return json.load(f)
+    meta = _json_loads(readme)
+    if not isinstance(meta, dict):
+        raise Exception("❌ README.json must contain a JSON object.")
+    return meta
+
+
+def project_files(meta):
+    # Files named in README.json that the evaluator reads
+    return [
+        os.path.normpath(meta[key])
+        for key in ("crud_module", "db_adapter")
+        if meta.get(key)
+    ]
+
+
+# -----------------------------
+# Utility: Shared in-memory DB
+# -----------------------------
+class SharedConnection(sqlite3.Connection):
+    # What fake_connection() hands the candidate: close() is a no-op (like
+    # SQLAlchemy's StaticPool) so closing after each operation does not
+    # destroy the database. Still a real sqlite3.Connection otherwise.
+    def close(self):
+        pass
+
+
+def make_shared_connection():
+    # One connection per evaluation, handed out by every fake_connection()
+    # call (StaticPool-style) so the candidate sees the tables we create.
+    conn = sqlite3.connect(
+        ":memory:", check_same_thread=False, factory=SharedConnection
+    )
+    conn.row_factory = sqlite3.Row
+    # Throwaway DB: durability is deliberately traded for speed
+    conn.executescript(
+        "PRAGMA journal_mode=MEMORY;"
+        "PRAGMA synchronous=OFF;"
+        "PRAGMA temp_store=MEMORY;"
+    )
+    return conn
+
+
+# -----------------------------
+# Utility: Table DDL
+# -----------------------------
+@functools.lru_cache(maxsize=128)
+def build_ddl(table_name, field_names):
+    # ID + all user fields (+ "name", used by the update/injection tests)
+    columns = dict.fromkeys([*field_names, "name"])
+    columns.pop("id", None)
+    fields = "".join(f", {k} TEXT" for k in columns)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table_name} "
+        f"(id INTEGER PRIMARY KEY{fields});"
+    )
+
+
+# -----------------------------
+# Utility: Static SQL injection scan
+# -----------------------------
+SQL_EXEC_METHODS = {"execute", "executemany", "executescript"}
+
+
+def is_literal_sql(node):
+    # "..." or "..." "..." or "..." + "..."
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.JoinedStr):
+        return not any(isinstance(v, ast.FormattedValue) for v in node.values)
+    return (
+        isinstance(node, ast.BinOp)
+        and isinstance(node.op, ast.Add)
+        and is_literal_sql(node.left)
+        and is_literal_sql(node.right)
+    )
+
+
+def is_formatted_sql(node):
+    # f"...{x}...", "..." % x, "..." + x, "...".format(x)
+    if is_literal_sql(node):
+        return False
+    if isinstance(node, ast.JoinedStr):
+        return True
+    if isinstance(node, ast.BinOp):
+        return isinstance(node.op, (ast.Mod, ast.Add))
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "format"
+    )
+
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+
+def iter_sql_calls(node, arg_names=frozenset()):
+    # Yield (execute call, parameter names of the innermost enclosing function)
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, FUNCTION_NODES):
+            a = child.args
+            names = {x.arg for x in a.posonlyargs + a.args + a.kwonlyargs}
+            names |= {x.arg for x in (a.vararg, a.kwarg) if x}
+            names -= {"self", "cls"}
+            yield from iter_sql_calls(child, frozenset(names))
+            continue
+
+        if (
+            isinstance(child, ast.Call)
+            and isinstance(child.func, ast.Attribute)
+            and child.func.attr in SQL_EXEC_METHODS
+            and child.args
+        ):
+            yield child, arg_names
+        yield from iter_sql_calls(child, arg_names)
+
+
+def find_unsafe_sql(tree):
+    """True if a query is string-formatted from a function's arguments with
+    no bound parameters, False if every query is a literal, None if
+    undecidable statically (left to the live injection probe)."""
+    found = False
+    ambiguous = False
+
+    for call, arg_names in iter_sql_calls(tree):
+        found = True
+        query = call.args[0]
+        if is_literal_sql(query):
+            continue
+
+        has_params = len(call.args) > 1 or any(
+            k.arg == "parameters" for k in call.keywords
+        )
+        from_args = any(
+            isinstance(n, ast.Name) and n.id in arg_names
+            for n in ast.walk(query)
+        )
+        if is_formatted_sql(query) and not has_params and from_args:
+            return True
+        # e.g. f"INSERT INTO {self.table} ... VALUES (?)" with params
+        ambiguous = True
+
+    return None if ambiguous or not found else False
+
+
+def scan_sql_source(src_bytes):
+    try:
+        return find_unsafe_sql(ast.parse(src_bytes))
+    except (SyntaxError, ValueError):
+        return None
+
+
+# -----------------------------
+# Utility: Code style check
+# -----------------------------
+def check_style(path, src_bytes):
+    if _style is None:
+        return True  # allow if pycodestyle not installed
+    # Fresh report per file: the StyleGuide is shared across threads
+    report = pycodestyle.BaseReport(_style.options)
+    checker = pycodestyle.Checker(
+        path,
+        lines=src_bytes.decode("utf-8", "replace").splitlines(True),
+        options=_style.options,
+        report=report,
+    )
+    return checker.check_all() == 0
+
+
+# -----------------------------
+# Utility: Background checks
+# -----------------------------
+# File-only checks (style, static SQL scan) run here while the main thread
+# imports and exercises the candidate code; DB-backed tests stay serial.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eval")
+
+
+# -----------------------------
+# Utility: Sandboxed CRUD run
+# -----------------------------
+CRUD_CPU_LIMIT = 5   # seconds of CPU for the candidate's CRUD calls
+CRUD_TIMEOUT = 6     # wall-clock seconds before the child is killed
+
+# Exit codes of a child stopped by RLIMIT_CPU (soft limit, then hard limit)
+CPU_LIMIT_EXITCODES = {
+    -sig for sig in (getattr(signal, "SIGXCPU", None),
+                     getattr(signal, "SIGKILL", None))
+    if sig is not None
+}
+
+_sandbox_ctx = None
+
+
+def sandbox_context():
+    # The child is started by a forkserver (or spawned) rather than forked
+    # from this multi-threaded process, and rebuilds the candidate module
+    # and its own database from the source bytes instead of inheriting
+    # them. Chosen on first use, not at import, so importing this module
+    # leaves the host's multiprocessing settings alone. As with any
+    # spawn/forkserver child, a host script must guard its entry point
+    # with `if __name__ == "__main__":`.
+    global _sandbox_ctx
+    if _sandbox_ctx is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload([__name__])
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        _sandbox_ctx = ctx
+    return _sandbox_ctx
+
+
+def build_sandbox(job):
+    # Candidate CRUD object wired to a fresh in-memory DB
+    conn = make_shared_connection()
+    conn.executescript(job["ddl"])
+
+    def fake_connection():
+        return conn
+
+    db_mod = dynamic_import_from_bytes(
+        job["db_src"], "db_module", job["db_file"]
+    )
+    setattr(db_mod, job["db_connect_fn"], fake_connection)
+
+    mod = dynamic_import_from_bytes(
+        job["crud_src"], "crud_module", job["crud_file"]
+    )
+    crud_obj = getattr(mod, job["crud_class"])()
+    setattr(crud_obj, "conn_override", fake_connection)
+    return crud_obj, conn
+
+
+def run_crud(crud_obj, sample_data, shared_conn):
+    with shared_conn:
+        crud_obj.create(sample_data)
+        read_item = crud_obj.read(sample_data["id"])
+        updated = crud_obj.update(sample_data["id"], {"name": "Updated"})
+        deleted = crud_obj.delete(sample_data["id"])
+
+    return all([read_item, updated, deleted])
+
+
+def probe_injection(crud_obj, table_name, shared_conn):
+    with shared_conn:
+        crud_obj.create({"id": 999, "name": "Robert'); DROP TABLE users; --"})
+
+    cur = shared_conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+        (table_name,)
+    )
+    return cur.fetchone() is not None
+
+
+def _sandbox_child(send, test, job):
+    if resource is not None:
+        limit = (CRUD_CPU_LIMIT, CRUD_CPU_LIMIT)
+        resource.setrlimit(resource.RLIMIT_CPU, limit)
+    try:
+        crud_obj, conn = build_sandbox(job)
+        if test == "crud":
+            result = run_crud(crud_obj, job["sample_data"], conn)
+        else:
+            result = probe_injection(crud_obj, job["table_name"], conn)
+        send.send((result, None))
+    except (Exception, SystemExit):
+        # SystemExit too: a candidate calling sys.exit() is an error report
+        send.send((False, traceback.format_exc()))
+
+
+def run_sandboxed(test, job):
+    """Run a live test ("crud" or "injection") in a CPU-limited child so a
+    hanging submission cannot block the worker. Returns (result, error)
+    where error is traceback text from the child."""
+    ctx = sandbox_context()
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(
+        target=_sandbox_child,
+        args=(send, test, job),
+        daemon=True,
+    )
+    proc.start()
+    send.close()
+
+    finished = recv.poll(CRUD_TIMEOUT)
+    try:
+        result = recv.recv() if finished else None
+    except EOFError:
+        result = None  # child died without reporting (e.g. CPU limit hit)
+
+    if proc.is_alive():
+        proc.kill()
+    proc.join()
+    recv.close()
+
+    if result is not None:
+        return result
+    if not finished:
+        return False, f"CRUD operations timed out after {CRUD_TIMEOUT}s"
+    if proc.exitcode in CPU_LIMIT_EXITCODES:
+        return False, (
+            f"CRUD process killed after exceeding the {CRUD_CPU_LIMIT}s "
+            "CPU limit"
+        )
+    return False, f"CRUD process exited with code {proc.exitcode}"
+
+
+# -----------------------------
+# Utility: Process warm-up
+# -----------------------------
+def warm_up():
+    # Pay one-time lazy initialisation at boot, not on the first request.
+    # Runs inline: pool threads started here would not survive a
+    # pre-forking server (e.g. gunicorn --preload). For the same reason
+    # the sandbox's forkserver is not started here; it starts on the first
+    # sandboxed test in each worker, so that request still pays its
+    # startup (tens of milliseconds).
+    sqlite3.Connection.close(make_shared_connection())
+    src = b"x = 1\n"
+    check_style("<warm-up>", src)
+    scan_sql_source(src)
+    dynamic_import_from_bytes(src, "warm_up_module")
 
 
 # -----------------------------
@@ -35,26 +429,30 @@ class Score:
     def __init__(self):
         self.total = 0
         self.earned = 0
+        # (ok, points, msg) tuples; rendered to strings in finalize()
         self.details = []
 
     def add(self, points, condition, success_msg, fail_msg):
+        ok = bool(condition)
         self.total += points
-        if condition:
-            self.earned += points
-            self.details.append("✔ " + success_msg)
-        else:
-            self.details.append("❌ " + fail_msg)
+        self.earned += points * ok
+        self.details.append((ok, points, (fail_msg, success_msg)[ok]))
 
 
 # -----------------------------
 # Core Evaluator
 # -----------------------------
 def evaluate_project(project_dir):
+    return evaluate_sources(read_project(project_dir))
+
+
+def evaluate_sources(sources):
+    """Evaluate a project given as {relative name: file bytes}."""
     report = {}
     score = Score()
 
     try:
-        meta = load_metadata(project_dir)
+        meta = load_metadata(sources)
     except Exception as e:
         return {"error": str(e)}
 
@@ -67,40 +465,52 @@ def evaluate_project(project_dir):
     if not crud_file or not crud_class_name:
         return {"error": "README.json must contain CRUD module + class name."}
 
-    crud_path = os.path.join(project_dir, crud_file)
-    db_path = os.path.join(project_dir, db_adapter_file)
+    crud_file = os.path.normpath(crud_file)
+    if db_adapter_file:
+        db_adapter_file = os.path.normpath(db_adapter_file)
 
     # -------------------------
     # Test 1: File existence
     # -------------------------
+    crud_ok = crud_file in sources
+    db_ok = db_adapter_file in sources
+
     score.add(
         10,
-        os.path.exists(crud_path),
+        crud_ok,
         "CRUD module found",
         "CRUD module missing",
     )
 
     score.add(
         10,
-        os.path.exists(db_path),
+        db_ok,
         "DB adapter file found",
         "DB adapter file missing",
     )
 
-    if not os.path.exists(crud_path):
+    if not crud_ok:
         return finalize(score, report)
 
+    # Shared by the import, the style check and the static SQL scan
+    src_bytes = sources[crud_file]
+
+    style_future = _executor.submit(check_style, crud_file, src_bytes)
+    sql_scan_future = _executor.submit(scan_sql_source, src_bytes)
+
     # -------------------------
     # Test 2: Import class
     # -------------------------
     try:
-        mod = dynamic_import(crud_path, "crud_module")
+        mod = dynamic_import_from_bytes(src_bytes, "crud_module", crud_file)
         CRUDClass = getattr(mod, crud_class_name)
         crud_obj = CRUDClass()
         imported = True
     except Exception as e:
         imported = False
-        score.details.append("❌ Could not import CRUD class: " + str(e))
+        score.details.append(
+            (False, 0, "Could not import CRUD class: " + str(e))
+        )
 
     score.add(
         20,
@@ -132,20 +542,24 @@ def evaluate_project(project_dir):
     # -------------------------
     # Test 4: SQLite Patch Simulation
     # -------------------------
-    # This replaces candidate's DB logic so tests won't modify real DB
-    db_mod = dynamic_import(db_path, "db_module")
-
-    def fake_connection():
-        conn = sqlite3.connect(":memory:")
-        conn.row_factory = sqlite3.Row
-        return conn
+    # The sandbox child replaces this function with one returning its
+    # in-memory DB, so tests won't modify the candidate's real DB
+    connect_fn = meta.get("db_connect_fn", "get_connection")
 
     try:
-        setattr(db_mod, meta.get("db_connect_fn", "get_connection"), fake_connection)
-        patched_db = True
+        db_mod = dynamic_import_from_bytes(
+            sources[db_adapter_file], "db_module", db_adapter_file
+        )
+        patched_db = callable(getattr(db_mod, connect_fn, None))
+        if not patched_db:
+            score.details.append(
+                (False, 0, f"DB adapter has no {connect_fn}() to replace")
+            )
     except Exception as e:
         patched_db = False
-        score.details.append("❌ Cannot patch DB connection: " + str(e))
+        score.details.append(
+            (False, 0, "Cannot patch DB connection: " + str(e))
+        )
 
     score.add(
         10,
@@ -160,30 +574,34 @@ def evaluate_project(project_dir):
     # -------------------------
     # Test 5: CRUD functional test
     # -------------------------
+    job = None
     try:
-        conn = fake_connection()
-        cur = conn.cursor()
-
-        # Basic schema (ID + all user fields)
-        table_name = list(meta.get("tables").values())[0]
-        fields = ", ".join(f"{k} TEXT" for k in sample_data.keys())
-        cur.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, {fields})")
-        conn.commit()
-
-        # Inject fake DB into candidate
-        setattr(crud_obj, "conn_override", fake_connection)
+        # A malformed "tables" entry fails this test, not the evaluation
+        table_name = next(iter((meta.get("tables") or {}).values()), None)
+        if not table_name:
+            raise Exception("README.json must list at least one table.")
+
+        # Everything the sandbox child needs to rebuild the candidate
+        job = {
+            "ddl": build_ddl(table_name, tuple(sample_data)),
+            "table_name": table_name,
+            "sample_data": sample_data,
+            "crud_file": crud_file,
+            "crud_src": src_bytes,
+            "crud_class": crud_class_name,
+            "db_file": db_adapter_file,
+            "db_src": sources[db_adapter_file],
+            "db_connect_fn": connect_fn,
+        }
 
         # RUN TESTS
-        crud_obj.create(sample_data)
-        read_item = crud_obj.read(sample_data["id"])
-        updated = crud_obj.update(sample_data["id"], {"name": "Updated"})
-        deleted = crud_obj.delete(sample_data["id"])
-
-        passed = all([read_item, updated, deleted])
+        passed, crud_error = run_sandboxed("crud", job)
 
     except Exception as e:
-        passed = False
-        score.details.append("❌ CRUD runtime error: " + traceback.format_exc())
+        passed, crud_error = False, e
+
+    if crud_error:
+        score.details.append((False, 0, ("CRUD runtime error: ", crud_error)))
 
     score.add(
         30,
@@ -195,22 +613,18 @@ def evaluate_project(project_dir):
     # -------------------------
     # Test 6: SQL Injection Safety
     # -------------------------
-    try:
-        conn = fake_connection()
-        cur = conn.cursor()
-        cur.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, name TEXT)")
-        conn.commit()
-
-        crud_obj.create({"id": 999, "name": "Robert'); DROP TABLE users; --"})
-
-        cur.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-            (table_name,)
-        )
-        still_exists = cur.fetchone() is not None
-
-    except Exception:
-        still_exists = False
+    unsafe = sql_scan_future.result()
+    if unsafe is not None:
+        still_exists = not unsafe
+    else:
+        # Static scan inconclusive: fall back to a live injection attempt
+        still_exists, probe_error = False, None
+        if job is not None:
+            still_exists, probe_error = run_sandboxed("injection", job)
+        if probe_error:
+            score.details.append(
+                (False, 0, ("Injection probe error: ", probe_error))
+            )
 
     score.add(
         20,
@@ -222,11 +636,7 @@ def evaluate_project(project_dir):
     # -------------------------
     # Test 7: Code Quality
     # -------------------------
-    try:
-        result = subprocess.run(["pycodestyle", crud_path], capture_output=True, text=True)
-        is_clean = (result.returncode == 0)
-    except FileNotFoundError:
-        is_clean = True  # allow if pycodestyle not installed
+    is_clean = style_future.result()
 
     score.add(
         10,
@@ -241,8 +651,24 @@ def evaluate_project(project_dir):
 # -----------------------------
 # Final Formatter
 # -----------------------------
+def render_detail(msg):
+    # (prefix, error) entries carry an exception whose traceback is only
+    # formatted here, when the report is actually built
+    if isinstance(msg, str):
+        return msg
+    prefix, err = msg
+    if isinstance(err, BaseException):
+        err = "".join(
+            traceback.format_exception(type(err), err, err.__traceback__)
+        )
+    return prefix + err
+
+
 def finalize(score, report):
     report["score"] = round(score.earned, 2)
     report["max_score"] = score.total
-    report["details"] = score.details
+    report["details"] = [
+        ("✔ " if ok else "❌ ") + render_detail(msg)
+        for ok, _, msg in score.details
+    ]
     return report
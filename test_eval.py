@@ -0,0 +1,68 @@
+import ast
+import unittest
+
+from eval import find_unsafe_sql
+
+
+def method(body):
+    return f"class CRUD:\n    def run(self, data, id):\n        {body}\n"
+
+
+# (description, source, expected verdict)
+CASES = [
+    ("literal SQL",
+     method('c.execute("SELECT * FROM t WHERE id = ?", (id,))'),
+     False),
+    ("implicitly concatenated literals",
+     method('c.execute("SELECT * " "FROM t" + " WHERE id = ?", (id,))'),
+     False),
+    ("f-string from an argument, no params",
+     method('c.execute(f"SELECT * FROM t WHERE id = {id}")'),
+     True),
+    ("f-string with bound params",
+     method('c.execute(f"SELECT * FROM t WHERE id = {id} AND x = ?", (1,))'),
+     None),
+    ("% formatting from an argument",
+     method('c.execute("SELECT * FROM t WHERE id = %s" % id)'),
+     True),
+    ("+ concatenation from an argument",
+     method('c.execute("SELECT * FROM t WHERE name = \'" + data["name"])'),
+     True),
+    (".format from an argument",
+     method('c.execute("SELECT * FROM t WHERE id = {}".format(id))'),
+     True),
+    ("self.table interpolation with params",
+     method('c.execute(f"INSERT INTO {self.table} VALUES (?)", (id,))'),
+     None),
+    ("self.table interpolation without params",
+     method('c.execute(f"CREATE TABLE {self.table} (id INTEGER)")'),
+     None),
+    ("query held in a variable",
+     method('c.execute(query, (id,))'),
+     None),
+    ("params passed by keyword",
+     method('c.execute(f"SELECT {id}", parameters=())'),
+     None),
+    ("no execute calls",
+     method("return data"),
+     None),
+]
+
+
+class FindUnsafeSqlTest(unittest.TestCase):
+    def test_cases(self):
+        for desc, src, expected in CASES:
+            with self.subTest(desc):
+                self.assertIs(find_unsafe_sql(ast.parse(src)), expected)
+
+    def test_unsafe_query_wins_over_safe_ones(self):
+        src = (
+            method('c.execute("SELECT 1")')
+            + "    def read(self, id):\n"
+            + '        c.execute(f"SELECT * FROM t WHERE id = {id}")\n'
+        )
+        self.assertIs(find_unsafe_sql(ast.parse(src)), True)
+
+
+if __name__ == "__main__":
+    unittest.main()